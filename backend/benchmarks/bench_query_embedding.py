@@ -0,0 +1,106 @@
+"""
+BENCHMARK - EMBEDDINGS DE PERGUNTAS SOB CARGA CONCORRENTE
+Compara encode() individual (lote de 1) com o EmbeddingBatcher.
+
+Uso (a partir da pasta backend):
+    python -m benchmarks.bench_query_embedding --concurrency 32 --requests 2000
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import statistics
+import threading
+import time
+
+from sentence_transformers import SentenceTransformer
+
+from services.embedding_batcher import EmbeddingBatcher
+
+QUESTIONS = [
+    "Qual é o tema principal do documento?",
+    "Quais são as conclusões apresentadas?",
+    "Quem são os autores citados?",
+    "Qual metodologia foi utilizada no estudo?",
+    "Quais são os requisitos para participar?",
+    "Qual é o prazo de entrega mencionado?",
+]
+
+
+def run_load(encode, concurrency: int, total_requests: int) -> dict:
+    """
+    Dispara total_requests perguntas com concurrency threads simultâneas
+
+    Args:
+        encode: Função que recebe uma pergunta e retorna o embedding
+        concurrency: Número de chamadores simultâneos
+        total_requests: Número total de perguntas
+
+    Returns:
+        Dicionário com QPS e latências (p50/p99 em ms)
+    """
+    latencies = []
+    lock = threading.Lock()
+
+    def call(i: int):
+        question = QUESTIONS[i % len(QUESTIONS)]
+        start = time.perf_counter()
+        encode(question)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(call, range(total_requests)))
+    total_time = time.perf_counter() - start
+
+    # quantiles(n=100) retorna os percentis 1..99 (interpolados)
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "qps": total_requests / total_time,
+        "p50": percentiles[49],
+        "p99": percentiles[98],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print("🔄 Carregando modelo de embeddings...")
+    model = SentenceTransformer("all-MiniLM-L6-v2")
+
+    # Aquecimento para não medir a primeira chamada
+    model.encode(QUESTIONS)
+
+    # Comportamento atual: cada requisição chama o modelo com um lote de 1
+    def encode_single(question: str):
+        return model.encode([question]).tolist()[0]
+
+    batcher = EmbeddingBatcher(
+        model, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms
+    )
+
+    results = {
+        "encode individual": run_load(encode_single, args.concurrency, args.requests),
+        "micro-batching": run_load(batcher.encode, args.concurrency, args.requests),
+    }
+
+    print(
+        f"\nConcorrência={args.concurrency} | Requisições={args.requests} | "
+        f"lote máx={args.max_batch_size} | janela={args.max_wait_ms}ms\n"
+    )
+    print(f"{'modo':<20}{'QPS':>10}{'p50 (ms)':>12}{'p99 (ms)':>12}")
+    for mode, result in results.items():
+        print(
+            f"{mode:<20}{result['qps']:>10.1f}"
+            f"{result['p50']:>12.2f}{result['p99']:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
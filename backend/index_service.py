@@ -0,0 +1,141 @@
+"""
+SERVIÇO DE ÍNDICE COMPARTILHADO
+Processo único dono do modelo de embeddings e do ChromaDB.
+
+Permite rodar a API principal com vários workers sem multiplicar o modelo
+em memória nem criar índices inconsistentes: todos os workers apontam para
+este serviço (variável VECTOR_STORE_URL) e todas as escritas passam por ele.
+
+IMPORTANTE: este serviço deve rodar com UM único worker.
+"""
+
+from fastapi import FastAPI
+from pydantic import BaseModel, Field
+from typing import List
+import os
+
+from services.vector_store import VectorStoreManager
+
+# ============================================================================
+# CONFIGURAÇÃO DA APLICAÇÃO FASTAPI
+# ============================================================================
+
+app = FastAPI(
+    title="RAG Index Service - Embeddings e Vector Store compartilhados",
+    description="Serviço interno usado pelos workers da RAG API",
+    version="1.0.0",
+)
+
+# ============================================================================
+# MODELOS PYDANTIC (SCHEMAS)
+# ============================================================================
+
+
+class AddDocumentsRequest(BaseModel):
+    """
+    Modelo para adicionar chunks ao índice
+    """
+
+    chunks: List[str] = Field(..., description="Chunks de texto do documento")
+    source: str = Field(..., description="Nome do arquivo fonte")
+
+
+class SearchRequest(BaseModel):
+    """
+    Modelo para busca semântica no índice
+    """
+
+    query: str = Field(..., description="Pergunta do usuário")
+    k: int = Field(3, ge=1, description="Número de chunks a retornar")
+
+
+class SentenceSearchRequest(BaseModel):
+    """
+    Modelo para busca de frases dentro dos chunks recuperados
+    """
+
+    query_embedding: List[float] = Field(..., description="Embedding da pergunta")
+    chunk_ids: List[str] = Field(..., description="IDs dos chunks recuperados")
+    k: int = Field(20, ge=1, description="Número máximo de frases")
+
+
+# ============================================================================
+# INICIALIZAÇÃO DOS SERVIÇOS
+# Um único VectorStoreManager (modelo + índice) para todos os workers da API
+# ============================================================================
+
+# O VectorStoreManager protege internamente buscas x escritas e só bloqueia
+# as buscas durante a troca de chunks (os embeddings são criados antes)
+vector_store = VectorStoreManager()
+
+# ============================================================================
+# ENDPOINTS DO SERVIÇO
+# Endpoints síncronos: o FastAPI os executa no threadpool, sem bloquear o loop
+# ============================================================================
+
+
+@app.post("/index/documents")
+def add_documents(request: AddDocumentsRequest):
+    """
+    Cria embeddings e adiciona os chunks ao índice (único ponto de escrita)
+    """
+    vector_store.add_documents(request.chunks, request.source)
+    return {"chunks": len(request.chunks)}
+
+
+@app.post("/index/search")
+def search(request: SearchRequest):
+    """
+    Busca os chunks mais relevantes e retorna também o embedding da pergunta
+    """
+    results, query_embedding = vector_store.search_with_embedding(
+        request.query, k=request.k
+    )
+    return {"results": results, "query_embedding": query_embedding}
+
+
+@app.post("/index/sentences")
+def search_sentences(request: SentenceSearchRequest):
+    """
+    Busca frases próximas da pergunta (usado pelo modo extrativo dos workers)
+    """
+    return vector_store.search_sentences(
+        request.query_embedding, request.chunk_ids, k=request.k
+    )
+
+
+@app.get("/index/count")
+def count():
+    """
+    Retorna o número de chunks armazenados
+    """
+    return {"count": vector_store.get_document_count()}
+
+
+@app.get("/index/documents", response_model=List[str])
+def list_documents():
+    """
+    Lista os documentos únicos do índice
+    """
+    return vector_store.list_documents()
+
+
+@app.delete("/index/documents")
+def clear_documents():
+    """
+    Remove todos os documentos do índice
+    """
+    vector_store.clear()
+    return {"message": "Índice limpo"}
+
+
+# ============================================================================
+# INICIALIZAÇÃO DO SERVIDOR
+# ============================================================================
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # Sempre um único worker: este processo é o dono do índice
+    port = int(os.getenv("INDEX_SERVICE_PORT", "8001"))
+    uvicorn.run("index_service:app", host="127.0.0.1", port=port, workers=1)
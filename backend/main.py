@@ -11,15 +11,17 @@ Funcionalidades:
 """
 
 from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import List, Optional
+import multiprocessing
 import os
 from datetime import datetime
 
 # Importações para processamento de PDF e RAG
 from services.pdf_processor import PDFProcessor
-from services.vector_store import VectorStoreManager
+from services.remote_vector_store import RemoteVectorStore
 from services.llm_service import LLMService
 
 # ============================================================================
@@ -124,8 +126,47 @@ class HealthResponse(BaseModel):
 # ============================================================================
 
 pdf_processor = PDFProcessor()
-vector_store = VectorStoreManager()
-llm_service = LLMService()
+
+# Com VECTOR_STORE_URL definida, os workers compartilham o modelo de embeddings
+# e o índice do serviço index_service.py (modo multi-worker). Sem ela, cada
+# processo carrega seu próprio modelo e índice em memória.
+vector_store_url = os.getenv("VECTOR_STORE_URL")
+
+# Vários workers com índices em memória separados ficariam inconsistentes:
+# um PDF enviado a um worker seria invisível aos outros. WEB_CONCURRENCY é a
+# variável que o uvicorn usa como padrão para --workers.
+api_workers = int(os.getenv("API_WORKERS") or os.getenv("WEB_CONCURRENCY") or "1")
+if api_workers > 1 and not vector_store_url:
+    raise RuntimeError(
+        f"{api_workers} workers configurados (API_WORKERS/WEB_CONCURRENCY) sem "
+        "VECTOR_STORE_URL: inicie o index_service.py e aponte "
+        "VECTOR_STORE_URL para ele"
+    )
+
+# "uvicorn main:app --workers N" não expõe N ao app; um processo filho sem
+# VECTOR_STORE_URL (fora do hot-reload de python main.py) indica esse caso
+if (
+    not vector_store_url
+    and multiprocessing.parent_process() is not None
+    and not os.getenv("API_RELOAD")
+):
+    print(
+        "⚠️  API rodando em processo filho sem VECTOR_STORE_URL: se houver vários "
+        "workers, cada um terá seu próprio índice (use o index_service.py)"
+    )
+
+if vector_store_url:
+    vector_store = RemoteVectorStore(
+        vector_store_url,
+        write_timeout=float(os.getenv("VECTOR_STORE_WRITE_TIMEOUT", "600")),
+    )
+else:
+    # Import tardio: no modo compartilhado os workers não carregam
+    # torch, sentence-transformers nem chromadb
+    from services.vector_store import VectorStoreManager
+
+    vector_store = VectorStoreManager()
+llm_service = LLMService(sentence_search_fn=vector_store.search_sentences)
 
 # ============================================================================
 # ENDPOINTS DA API
@@ -140,7 +181,9 @@ async def root():
     return {
         "status": "online",
         "message": "RAG API está funcionando! Use /docs para ver a documentação completa.",
-        "documents_loaded": vector_store.get_document_count(),
+        "documents_loaded": await run_in_threadpool(
+            vector_store.get_document_count
+        ),
     }
 
 
@@ -152,7 +195,9 @@ async def health_check():
     return {
         "status": "healthy",
         "message": "Todos os serviços estão operacionais",
-        "documents_loaded": vector_store.get_document_count(),
+        "documents_loaded": await run_in_threadpool(
+            vector_store.get_document_count
+        ),
     }
 
 
@@ -192,11 +237,13 @@ async def upload_pdf(file: UploadFile = File(...)):
 
         # PASSO 1: Extrai texto do PDF
         print(f"📄 Processando PDF: {file.filename}")
-        text_chunks, num_pages = pdf_processor.process_pdf(temp_path)
+        text_chunks, num_pages = await run_in_threadpool(
+            pdf_processor.process_pdf, temp_path
+        )
 
         # PASSO 2: Cria embeddings e armazena no vector store
         print(f"🔍 Criando embeddings para {len(text_chunks)} chunks...")
-        vector_store.add_documents(text_chunks, file.filename)
+        await run_in_threadpool(vector_store.add_documents, text_chunks, file.filename)
 
         # Remove arquivo temporário
         os.remove(temp_path)
@@ -235,7 +282,7 @@ async def query_documents(request: QueryRequest):
     """
 
     # Verifica se há documentos carregados
-    if vector_store.get_document_count() == 0:
+    if await run_in_threadpool(vector_store.get_document_count) == 0:
         raise HTTPException(
             status_code=400,
             detail="Nenhum documento carregado. Faça upload de um PDF primeiro.",
@@ -244,7 +291,10 @@ async def query_documents(request: QueryRequest):
     try:
         # PASSO 1: RETRIEVAL - Busca chunks relevantes
         print(f"🔍 Buscando contexto para: {request.question}")
-        relevant_chunks = vector_store.search(request.question, k=request.top_k)
+        # Roda no threadpool para que buscas concorrentes sejam agrupadas em lote
+        relevant_chunks, query_embedding = await run_in_threadpool(
+            vector_store.search_with_embedding, request.question, k=request.top_k
+        )
 
         if not relevant_chunks:
             raise HTTPException(
@@ -265,11 +315,15 @@ async def query_documents(request: QueryRequest):
 
         # PASSO 3: GENERATION - Gera resposta com a LLM
         print(f"🤖 Gerando resposta com temperatura={request.temperature}")
-        answer, tokens_used = llm_service.generate_answer(
+        # Roda no threadpool: retries e backoff não bloqueiam o event loop
+        answer, tokens_used = await run_in_threadpool(
+            llm_service.generate_answer,
             question=request.question,
             context=context,
             temperature=request.temperature,
             max_tokens=request.max_tokens,
+            chunks=relevant_chunks,
+            query_embedding=query_embedding,
         )
 
         return {
@@ -293,7 +347,7 @@ async def list_documents():
     Returns:
         Lista com nomes dos documentos
     """
-    documents = vector_store.list_documents()
+    documents = await run_in_threadpool(vector_store.list_documents)
     return documents
 
 
@@ -306,7 +360,7 @@ async def clear_documents():
     Returns:
         Mensagem de confirmação
     """
-    vector_store.clear()
+    await run_in_threadpool(vector_store.clear)
     return {"message": "Todos os documentos foram removidos do sistema"}
 
 
@@ -318,5 +372,11 @@ if __name__ == "__main__":
     import uvicorn
 
     # Inicia o servidor na porta 8000
-    # reload=True permite hot-reload durante desenvolvimento
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    # API_WORKERS > 1 exige o serviço de índice compartilhado (checado acima)
+    if api_workers > 1:
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=api_workers)
+    else:
+        # reload=True permite hot-reload durante desenvolvimento; o processo
+        # filho do reload herda API_RELOAD e não emite o aviso de workers
+        os.environ["API_RELOAD"] = "1"
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,98 @@
+"""
+CIRCUIT BREAKER
+Evita chamar um serviço externo (OpenAI) enquanto ele está instável
+"""
+
+import threading
+import time
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker simples com três estados
+
+    - closed: chamadas liberadas; falhas consecutivas são contadas
+    - open: após failure_threshold falhas, chamadas são recusadas por
+      recovery_timeout segundos (o chamador usa o caminho alternativo)
+    - half-open: passado o tempo, uma única chamada de teste é liberada;
+      sucesso fecha o circuito, falha o abre novamente
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        """
+        Inicializa o circuit breaker
+
+        Args:
+            failure_threshold: Falhas consecutivas para abrir o circuito
+            recovery_timeout: Segundos com o circuito aberto antes de testar de novo
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_progress = False
+
+    @property
+    def state(self) -> str:
+        """
+        Estado atual do circuito: "closed", "open" ou "half-open"
+        """
+        with self._lock:
+            return self._state()
+
+    def allow_request(self) -> bool:
+        """
+        Indica se uma chamada pode ser feita agora
+
+        Returns:
+            True se o circuito está fechado ou liberando a chamada de teste
+        """
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_progress:
+                self._trial_in_progress = True
+                return True
+            return False
+
+    def record_success(self):
+        """
+        Registra uma chamada bem-sucedida (fecha o circuito)
+        """
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_progress = False
+
+    def record_failure(self):
+        """
+        Registra uma chamada com falha (pode abrir o circuito)
+        """
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_progress or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_progress = False
+
+    def record_neutral(self):
+        """
+        Registra um erro que não indica instabilidade (ex: requisição inválida)
+
+        Não altera a contagem de falhas; apenas libera a chamada de teste
+        do estado half-open, se for o caso.
+        """
+        with self._lock:
+            self._trial_in_progress = False
+
+    def _state(self) -> str:
+        """
+        Calcula o estado (deve ser chamado com o lock adquirido)
+        """
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.recovery_timeout:
+            return "half-open"
+        return "open"
@@ -0,0 +1,143 @@
+"""
+SERVIÇO DE MICRO-BATCHING DE EMBEDDINGS
+Agrupa perguntas concorrentes em um único encode() do modelo de embeddings
+"""
+
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import List, Optional
+import queue
+import threading
+import time
+
+
+class EmbeddingBatcher:
+    """
+    Fila de micro-batching na frente do modelo de embeddings
+
+    Cada chamada a encode() entra em uma fila; uma thread dedicada junta as
+    perguntas que chegam ao mesmo tempo (até max_batch_size ou max_wait_ms),
+    chama o modelo uma única vez e devolve o vetor de cada chamador.
+
+    O batching é adaptativo: com tráfego baixo (lote anterior de tamanho 1)
+    a pergunta é processada imediatamente, sem esperar a janela.
+    """
+
+    def __init__(
+        self,
+        model,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        timeout: Optional[float] = 30.0,
+    ):
+        """
+        Inicializa o batcher e inicia a thread de processamento
+
+        Args:
+            model: Modelo com método encode(lista_de_textos) (ex: SentenceTransformer)
+            max_batch_size: Número máximo de perguntas por lote
+            max_wait_ms: Tempo máximo (em ms) esperando novas perguntas para o lote
+            timeout: Tempo máximo (em segundos) que encode() espera pelo vetor;
+                None = sem limite
+        """
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.timeout = timeout
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._last_batch_size = 1
+
+        self._worker = threading.Thread(
+            target=self._run, name="embedding-batcher", daemon=True
+        )
+        self._worker.start()
+
+    def encode(self, text: str) -> List[float]:
+        """
+        Cria o embedding de um texto, agrupando com chamadas concorrentes
+
+        Args:
+            text: Texto a ser convertido em embedding
+
+        Returns:
+            Vetor de embedding do texto
+
+        Raises:
+            TimeoutError: Se o vetor não ficar pronto em self.timeout segundos
+        """
+        future: Future = Future()
+        self._queue.put((text, future))
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Se ainda estiver na fila, a pergunta é descartada do próximo lote
+            future.cancel()
+            raise
+
+    def _collect_batch(self) -> list:
+        """
+        Monta o próximo lote a partir da fila (bloqueia até a primeira pergunta)
+
+        Returns:
+            Lista de tuplas (texto, future)
+        """
+        batch = [self._queue.get()]
+
+        # Pega tudo que já está na fila sem esperar
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        # Só espera a janela se houve concorrência recentemente
+        if len(batch) > 1 or self._last_batch_size > 1:
+            remaining = self.max_wait
+            deadline = time.monotonic() + remaining
+            while len(batch) < self.max_batch_size and remaining > 0:
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+                remaining = deadline - time.monotonic()
+
+        self._last_batch_size = len(batch)
+        return batch
+
+    def _run(self):
+        """
+        Loop da thread de processamento: monta lotes e chama o modelo
+
+        Qualquer erro depois de montar o lote é repassado aos chamadores,
+        para que nenhum deles fique esperando um vetor que nunca virá.
+        """
+        while True:
+            batch = self._collect_batch()
+
+            try:
+                # Descarta perguntas cujos chamadores já desistiram (timeout)
+                batch = [
+                    (text, future)
+                    for text, future in batch
+                    if future.set_running_or_notify_cancel()
+                ]
+                if not batch:
+                    continue
+
+                texts = [text for text, _ in batch]
+                embeddings = self.model.encode(texts).tolist()
+                if len(embeddings) != len(batch):
+                    raise RuntimeError(
+                        f"Modelo retornou {len(embeddings)} embeddings "
+                        f"para {len(batch)} textos"
+                    )
+
+                for (_, future), embedding in zip(batch, embeddings):
+                    future.set_result(embedding)
+            except BaseException as e:
+                # Propaga o erro para todos os chamadores ainda sem resposta
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                if not isinstance(e, Exception):
+                    raise
@@ -0,0 +1,175 @@
+"""
+SERVIÇO DE RESPOSTA EXTRATIVA (RAG sem IA)
+Seleciona as frases mais relevantes dos chunks recuperados, com citação de página
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+import re
+
+from services.pdf_processor import PAGE_MARKER_PATTERN
+
+# Fim de frase (pontuação seguida de espaço), parágrafo ou item de lista
+SENTENCE_SPLIT_PATTERN = re.compile(r"(?<=[.!?;])\s+|\n{2,}|\n(?=•)")
+
+# Palavras (com acentos) para a sobreposição lexical
+WORD_PATTERN = re.compile(r"\w+")
+
+# Palavras muito comuns que não ajudam a medir relevância
+STOPWORDS = set(
+    "a o as os de da do das dos e é em no na nos nas um uma que qual quais "
+    "para por com se ao à the of and to in is".split()
+)
+
+
+def split_sentences(
+    text: str, min_chars: int = 20
+) -> List[Tuple[str, Optional[int]]]:
+    """
+    Divide o texto de um chunk em frases, rastreando a página de cada uma
+
+    Usado na ingestão (VectorStoreManager) e no modo extrativo sem embeddings.
+
+    Args:
+        text: Texto do chunk (com marcadores "[Página N]")
+        min_chars: Frases menores que isso são descartadas
+
+    Returns:
+        Lista de tuplas (frase, página)
+    """
+    sentences = []
+
+    # split com grupo de captura alterna texto e número de página
+    parts = PAGE_MARKER_PATTERN.split(text)
+    page = None
+
+    for index, part in enumerate(parts):
+        if index % 2 == 1:
+            page = int(part)
+            continue
+
+        for sentence in SENTENCE_SPLIT_PATTERN.split(part):
+            # Quebras de linha simples são apenas layout do PDF
+            sentence = " ".join(sentence.split())
+            if len(sentence) >= min_chars:
+                sentences.append((sentence, page))
+
+    return sentences
+
+
+class ExtractiveAnswerer:
+    """
+    Motor de respostas extrativas para o modo sem LLM
+
+    Pontua as frases dos chunks recuperados contra a pergunta (similaridade
+    com o embedding da query + sobreposição de palavras) e retorna as
+    melhores frases com a página de origem.
+
+    Os embeddings das frases são criados na ingestão; aqui apenas o vetor da
+    pergunta, já calculado na busca, é comparado com eles. Sem busca de
+    frases disponível, a pontuação usa só a sobreposição de palavras.
+    """
+
+    def __init__(
+        self,
+        sentence_search_fn: Optional[
+            Callable[[List[float], List[str], int], List[Dict]]
+        ] = None,
+        max_sentences: int = 5,
+        max_candidates: int = 20,
+        min_sentence_chars: int = 20,
+        lexical_weight: float = 0.3,
+        min_score: float = 0.25,
+    ):
+        """
+        Inicializa o motor extrativo
+
+        Args:
+            sentence_search_fn: Busca de frases por embedding (VectorStoreManager.search_sentences)
+            max_sentences: Número máximo de frases na resposta
+            max_candidates: Máximo de frases candidatas trazidas da busca
+            min_sentence_chars: Frases menores que isso são descartadas
+            lexical_weight: Peso da sobreposição de palavras no score final
+            min_score: Score mínimo para uma frase entrar na resposta
+        """
+        self.sentence_search_fn = sentence_search_fn
+        self.max_sentences = max_sentences
+        self.max_candidates = max_candidates
+        self.min_sentence_chars = min_sentence_chars
+        self.lexical_weight = lexical_weight
+        self.min_score = min_score
+
+    def answer(
+        self,
+        question: str,
+        chunks: List[Dict],
+        query_embedding: Optional[List[float]] = None,
+    ) -> List[Tuple[str, Optional[int]]]:
+        """
+        Seleciona as frases mais relevantes para a pergunta
+
+        Args:
+            question: Pergunta do usuário
+            chunks: Chunks recuperados (dicionários com "text" e, da busca, "id")
+            query_embedding: Embedding da pergunta já calculado na busca
+
+        Returns:
+            Lista de tuplas (frase, página) em ordem de relevância
+        """
+        question_words = self._words(question)
+        chunk_ids = [chunk["id"] for chunk in chunks if "id" in chunk]
+
+        scored = []
+        seen = set()
+
+        if self.sentence_search_fn and query_embedding is not None and chunk_ids:
+            candidates = self.sentence_search_fn(
+                query_embedding, chunk_ids, self.max_candidates
+            )
+            for candidate in candidates:
+                lexical = self._overlap(question_words, candidate["text"])
+                score = (
+                    lexical * self.lexical_weight
+                    + candidate["score"] * (1 - self.lexical_weight)
+                )
+                scored.append((score, candidate["text"], candidate["page"]))
+        else:
+            for chunk in chunks:
+                for text, page in split_sentences(
+                    chunk["text"], self.min_sentence_chars
+                ):
+                    scored.append((self._overlap(question_words, text), text, page))
+
+        # Mais relevantes primeiro; frases repetidas (sobreposição entre
+        # chunks) e abaixo do score mínimo são descartadas
+        scored.sort(key=lambda item: item[0], reverse=True)
+
+        best = []
+        for score, text, page in scored:
+            key = text.lower()
+            if score < self.min_score or key in seen:
+                continue
+            seen.add(key)
+            best.append((text, page))
+            if len(best) == self.max_sentences:
+                break
+
+        return best
+
+    @staticmethod
+    def _words(text: str) -> set:
+        """
+        Conjunto de palavras relevantes (minúsculas, sem stopwords)
+        """
+        return {
+            word
+            for word in WORD_PATTERN.findall(text.lower())
+            if word not in STOPWORDS
+        }
+
+    def _overlap(self, question_words: set, sentence: str) -> float:
+        """
+        Fração das palavras da pergunta presentes na frase
+        """
+        if not question_words:
+            return 0.0
+        return len(question_words & self._words(sentence)) / len(question_words)
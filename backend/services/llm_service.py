@@ -3,10 +3,34 @@ SERVIÇO DE LLM (Large Language Model)
 Gerencia a geração de respostas usando OpenAI GPT
 """
 
-from openai import OpenAI
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AuthenticationError,
+    InternalServerError,
+    OpenAI,
+    RateLimitError,
+)
 import os
-import re
-from typing import Tuple
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from services.circuit_breaker import CircuitBreaker
+from services.extractive_answer import ExtractiveAnswerer
+
+# Erros transitórios que valem uma nova tentativa
+RETRYABLE_ERRORS = (
+    APITimeoutError,
+    APIConnectionError,
+    InternalServerError,
+    RateLimitError,
+)
+
+# Estimativa grosseira de caracteres por token (suficiente para roteamento)
+CHARS_PER_TOKEN = 4
 
 
 class LLMService:
@@ -16,13 +40,77 @@ class LLMService:
     Responsável por gerar respostas baseadas no contexto recuperado
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        sentence_search_fn: Optional[
+            Callable[[List[float], List[str], int], List[Dict]]
+        ] = None,
+    ):
         """
         Inicializa o serviço de LLM
 
+        Args:
+            sentence_search_fn: Busca de frases por embedding, usada pelo modo extrativo
+
         Nota: Requer a variável de ambiente OPENAI_API_KEY
+
+        Variáveis de ambiente opcionais:
+            OPENAI_BASE_URL: Endpoint compatível com OpenAI (ex: servidor fake local)
+            LLM_MODEL: Modelo principal (padrão: gpt-3.5-turbo)
+            LLM_FAST_MODEL: Modelo rápido/barato para prompts pequenos (desativado se vazio)
+            LLM_FAST_MAX_TOKENS: max_tokens até o qual o modelo rápido é usado
+            LLM_FAST_MAX_PROMPT_TOKENS: Tamanho estimado do prompt (contexto + pergunta)
+                até o qual o modelo rápido é usado
+            LLM_TIMEOUT: Timeout de cada chamada, em segundos
+            LLM_MAX_RETRIES: Novas tentativas em erros transitórios
+            LLM_BACKOFF_BASE / LLM_BACKOFF_MAX: Backoff exponencial com jitter, em segundos
+            LLM_HEDGE_AFTER: Dispara uma chamada paralela após N segundos (0 desativa)
+            LLM_HEDGE_MAX_WORKERS: Máximo de chamadas paralelas (hedges) simultâneas
+            LLM_HEDGE_BUDGET: Fração máxima de chamadas que podem gerar hedge
+            LLM_BREAKER_FAILURES / LLM_BREAKER_RECOVERY: Configuração do circuit breaker
         """
 
+        # Motor extrativo usado quando não há LLM disponível
+        self.extractive = ExtractiveAnswerer(sentence_search_fn=sentence_search_fn)
+
+        # Roteamento de modelos
+        self.model = os.getenv("LLM_MODEL", "gpt-3.5-turbo")
+        self.fast_model = os.getenv("LLM_FAST_MODEL", "")
+        self.fast_max_tokens = int(os.getenv("LLM_FAST_MAX_TOKENS", "150"))
+        self.fast_max_prompt_tokens = int(
+            os.getenv("LLM_FAST_MAX_PROMPT_TOKENS", "600")
+        )
+
+        # Timeouts, retries e hedging
+        self.timeout = float(os.getenv("LLM_TIMEOUT", "20"))
+        self.max_retries = int(os.getenv("LLM_MAX_RETRIES", "2"))
+        self.backoff_base = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+        self.backoff_max = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+        self.hedge_after = float(os.getenv("LLM_HEDGE_AFTER", "0"))
+        self.hedge_max_workers = int(os.getenv("LLM_HEDGE_MAX_WORKERS", "4"))
+        self.hedge_budget = float(os.getenv("LLM_HEDGE_BUDGET", "0.1"))
+        self.hedge_executor = (
+            ThreadPoolExecutor(
+                max_workers=self.hedge_max_workers, thread_name_prefix="llm-hedge"
+            )
+            if self.hedge_after > 0
+            else None
+        )
+
+        # Orçamento de hedges (token bucket): cada chamada acumula hedge_budget
+        # fichas, cada hedge gasta uma. Assim uma OpenAI degradada recebe no
+        # máximo (1 + hedge_budget) vezes o tráfego, e não o dobro. O semáforo
+        # impede que hedges fiquem enfileirados no pool.
+        self._hedge_lock = threading.Lock()
+        self._hedge_tokens = float(self.hedge_max_workers)
+        self._hedge_slots = threading.BoundedSemaphore(self.hedge_max_workers)
+
+        # Enquanto a OpenAI estiver instável, responde direto pelo modo extrativo
+        self.breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+            recovery_timeout=float(os.getenv("LLM_BREAKER_RECOVERY", "30")),
+        )
+
         # Obtém a API key do ambiente
         api_key = os.getenv("OPENAI_API_KEY")
 
@@ -43,7 +131,13 @@ class LLMService:
         else:
             print("✅ OpenAI configurada - Respostas com IA ativadas")
             try:
-                self.client = OpenAI(api_key=api_key)
+                # Retries ficam a cargo deste serviço (com backoff e breaker)
+                self.client = OpenAI(
+                    api_key=api_key,
+                    base_url=os.getenv("OPENAI_BASE_URL") or None,
+                    timeout=self.timeout,
+                    max_retries=0,
+                )
             except Exception as e:
                 print(f"❌ Erro ao inicializar OpenAI: {e}")
                 print("🔄 Usando modo RAG sem IA")
@@ -55,6 +149,8 @@ class LLMService:
         context: str,
         temperature: float = 0.7,
         max_tokens: int = 500,
+        chunks: Optional[List[Dict]] = None,
+        query_embedding: Optional[List[float]] = None,
     ) -> Tuple[str, int]:
         """
         Gera uma resposta usando a LLM com o contexto fornecido
@@ -64,6 +160,8 @@ class LLMService:
             context: Contexto recuperado do vector store
             temperature: Controla a criatividade (0=determinístico, 2=criativo)
             max_tokens: Número máximo de tokens na resposta
+            chunks: Chunks recuperados (usados pelo modo extrativo)
+            query_embedding: Embedding da pergunta calculado na busca
 
         Returns:
             Tupla contendo (resposta, tokens_usados)
@@ -71,7 +169,16 @@ class LLMService:
 
         # Se não há cliente OpenAI, retorna resposta mock
         if not self.client:
-            return self._generate_mock_answer(question, context), 0
+            return self._generate_mock_answer(
+                question, context, chunks, query_embedding
+            ), 0
+
+        # Circuito aberto: não espera por uma OpenAI sabidamente instável
+        if not self.breaker.allow_request():
+            print("⚡ Circuit breaker aberto - Usando modo RAG sem IA")
+            return self._generate_mock_answer(
+                question, context, chunks, query_embedding
+            ), 0
 
         # Monta o prompt para a LLM
         system_prompt = """Você é um assistente especializado em responder perguntas baseado em documentos.
@@ -97,23 +204,28 @@ PERGUNTA DO USUÁRIO:
 
 RESPOSTA:"""
 
+        messages = [
+            {
+                "role": "system",
+                "content": system_prompt.format(temperature=temperature),
+            },
+            {"role": "user", "content": user_prompt},
+        ]
+        prompt_chars = sum(len(message["content"]) for message in messages)
+
+        request = {
+            "model": self._select_model(prompt_chars, max_tokens),
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "top_p": 0.9,  # Nucleus sampling para reduzir alucinações
+            "frequency_penalty": 0.3,  # Reduz repetições
+            "presence_penalty": 0.3,  # Incentiva novos tópicos
+        }
+
         try:
-            # Chama a API da OpenAI
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",  # Modelo mais econômico
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_prompt.format(temperature=temperature),
-                    },
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=temperature,
-                max_tokens=max_tokens,
-                top_p=0.9,  # Nucleus sampling para reduzir alucinações
-                frequency_penalty=0.3,  # Reduz repetições
-                presence_penalty=0.3,  # Incentiva novos tópicos
-            )
+            # Chama a API da OpenAI (com retries, hedging e circuit breaker)
+            response = self._call_with_retries(request)
 
             # Extrai a resposta
             answer = response.choices[0].message.content
@@ -122,86 +234,238 @@ RESPOSTA:"""
             return answer, tokens_used
 
         except Exception as e:
-            error_msg = str(e)
-            print(f"❌ Erro ao chamar OpenAI: {error_msg}")
+            print(f"❌ Erro ao chamar OpenAI: {e}")
 
             # Detecta erros específicos
-            if "429" in error_msg or "quota" in error_msg.lower():
+            if isinstance(e, RateLimitError):
                 print("💡 Cota da OpenAI excedida - Usando modo RAG sem IA")
-            elif "401" in error_msg or "authentication" in error_msg.lower():
+            elif isinstance(e, AuthenticationError):
                 print("💡 Erro de autenticação - Usando modo RAG sem IA")
             else:
                 print("💡 Erro na API OpenAI - Usando modo RAG sem IA")
 
             # Retorna resposta usando apenas o contexto recuperado
-            return self._generate_mock_answer(question, context), 0
+            return self._generate_mock_answer(
+                question, context, chunks, query_embedding
+            ), 0
 
-    def _generate_mock_answer(self, question: str, context: str) -> str:
+    def _select_model(self, prompt_chars: int, max_tokens: int) -> str:
         """
-        Gera uma resposta usando apenas o contexto recuperado (RAG sem IA)
+        Escolhe o modelo: prompts pequenos ou respostas curtas vão para o modelo rápido
+
+        O tamanho do prompt vem principalmente do contexto recuperado, não da
+        pergunta, por isso o roteamento usa o prompt completo.
 
         Args:
-            question: Pergunta do usuário
-            context: Contexto do documento
+            prompt_chars: Número de caracteres do prompt (sistema + contexto + pergunta)
+            max_tokens: Número máximo de tokens na resposta
 
         Returns:
-            Resposta formatada baseada no contexto
+            Nome do modelo a ser usado
         """
-        # Limpa caracteres especiais do PDF
-        clean_context = self._clean_pdf_text(context)
+        prompt_tokens = prompt_chars // CHARS_PER_TOKEN
+        if self.fast_model and (
+            max_tokens <= self.fast_max_tokens
+            or prompt_tokens <= self.fast_max_prompt_tokens
+        ):
+            return self.fast_model
+        return self.model
+
+    def _call_with_retries(self, request: Dict):
+        """
+        Chama a OpenAI com retries em erros transitórios
 
-        # Divide o contexto em parágrafos
-        paragraphs = [p.strip() for p in clean_context.split("\n") if p.strip()]
+        Usa backoff exponencial com jitter ("full jitter") entre as tentativas
+        e registra o resultado no circuit breaker. Erros não transitórios
+        (ex: requisição inválida, autenticação, cota esgotada) não são
+        repetidos nem contam como instabilidade da OpenAI.
 
-        # Monta uma resposta formatada e legível
-        response = f"""📄 RESPOSTA BASEADA NO DOCUMENTO (Modo RAG)
+        Args:
+            request: Parâmetros de chat.completions.create
 
-**Sua pergunta:** {question}
+        Returns:
+            Resposta da OpenAI
+        """
+        attempt = 0
 
-**Informações encontradas no documento:**
+        while True:
+            try:
+                response = self._call_with_hedging(request)
+            except Exception as e:
+                retryable = isinstance(e, RETRYABLE_ERRORS)
+                if self._is_quota_error(e):
+                    retryable = False
+
+                # Só erros transitórios indicam OpenAI instável
+                if retryable:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_neutral()
+
+                if (
+                    not retryable
+                    or attempt >= self.max_retries
+                    or not self.breaker.allow_request()
+                ):
+                    raise
+
+                delay = random.uniform(
+                    0, min(self.backoff_max, self.backoff_base * 2**attempt)
+                )
+                print(f"🔄 Erro transitório na OpenAI, nova tentativa em {delay:.2f}s")
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            self.breaker.record_success()
+            return response
+
+    def _call_with_hedging(self, request: Dict):
+        """
+        Faz a chamada e, se demorar mais que hedge_after, dispara uma segunda
 
-"""
+        Sem orçamento de hedge disponível, a chamada roda direto na thread do
+        chamador. Com orçamento, a chamada principal começa imediatamente em
+        uma thread própria (nunca enfileirada, para que hedge_after meça só a
+        latência real da OpenAI) e a thread do chamador fica livre para
+        devolver o resultado do hedge, se ele terminar primeiro. O hedge roda
+        no pool limitado e só é disparado se houver vaga e ficha no orçamento.
 
-        # Adiciona os parágrafos mais relevantes (até 1200 caracteres)
-        char_count = 0
-        max_chars = 1200
+        A chamada que perder a corrida não é cancelada, apenas ignorada.
 
-        for para in paragraphs:
-            if char_count + len(para) > max_chars:
+        Args:
+            request: Parâmetros de chat.completions.create
+
+        Returns:
+            Resposta da OpenAI
+        """
+        if not self.hedge_executor or not self._refill_hedge_budget():
+            return self.client.chat.completions.create(**request)
+
+        primary = Future()
+        threading.Thread(
+            target=self._run_into_future,
+            args=(primary, request),
+            name="llm-primary",
+            daemon=True,
+        ).start()
+
+        done, pending = wait({primary}, timeout=self.hedge_after)
+
+        if not done:
+            hedge = self._submit_hedge(request)
+            if hedge:
+                print("⏱️  OpenAI lenta - Disparando chamada paralela (hedge)")
+                pending.add(hedge)
+
+        error = None
+        while done or pending:
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+            if not pending:
                 break
-            response += f"{para}\n\n"
-            char_count += len(para)
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
 
-        if char_count >= max_chars:
-            response += "...\n\n"
+        raise error
 
-        response += """---
-💡 **Nota:** Esta resposta mostra diretamente o conteúdo recuperado do documento.
-   Para respostas sintetizadas por IA, adicione créditos à sua conta OpenAI.
-"""
+    def _refill_hedge_budget(self) -> bool:
+        """
+        Adiciona hedge_budget fichas ao orçamento (limitado ao tamanho do pool)
 
-        return response
+        Returns:
+            True se há ficha para um eventual hedge nesta chamada
+        """
+        with self._hedge_lock:
+            self._hedge_tokens = min(
+                float(self.hedge_max_workers), self._hedge_tokens + self.hedge_budget
+            )
+            return self._hedge_tokens >= 1
+
+    def _submit_hedge(self, request: Dict) -> Optional[Future]:
+        """
+        Dispara o hedge no pool se houver ficha no orçamento e vaga livre
+
+        Returns:
+            Future do hedge, ou None se o hedge não foi disparado
+        """
+        with self._hedge_lock:
+            if self._hedge_tokens < 1:
+                return None
+            if not self._hedge_slots.acquire(blocking=False):
+                return None
+            self._hedge_tokens -= 1
+
+        def run_hedge():
+            try:
+                return self.client.chat.completions.create(**request)
+            finally:
+                self._hedge_slots.release()
+
+        return self.hedge_executor.submit(run_hedge)
+
+    def _run_into_future(self, future: Future, request: Dict):
+        """
+        Executa a chamada principal e guarda o resultado (ou erro) no future
+        """
+        try:
+            future.set_result(self.client.chat.completions.create(**request))
+        except Exception as e:
+            future.set_exception(e)
+
+    @staticmethod
+    def _is_quota_error(error: Exception) -> bool:
+        """
+        Indica se o 429 é cota esgotada (não adianta repetir) e não rate limit
+        """
+        return getattr(error, "code", None) == "insufficient_quota"
 
-    def _clean_pdf_text(self, text: str) -> str:
+    def _generate_mock_answer(
+        self,
+        question: str,
+        context: str,
+        chunks: Optional[List[Dict]] = None,
+        query_embedding: Optional[List[float]] = None,
+    ) -> str:
         """
-        Limpa texto extraído de PDFs removendo caracteres especiais
+        Gera uma resposta extrativa usando apenas o contexto recuperado (RAG sem IA)
 
         Args:
-            text: Texto a ser limpo
+            question: Pergunta do usuário
+            context: Contexto do documento
+            chunks: Chunks recuperados (com marcadores de página)
+            query_embedding: Embedding da pergunta calculado na busca
 
         Returns:
-            Texto limpo e formatado
+            Resposta formatada com as frases mais relevantes e suas páginas
         """
-        if not text:
-            return ""
+        if chunks is None:
+            chunks = [{"text": context}]
+
+        # Seleciona as frases mais relevantes para a pergunta
+        sentences = self.extractive.answer(question, chunks, query_embedding)
+
+        # Monta uma resposta formatada e legível
+        response = f"""📄 RESPOSTA BASEADA NO DOCUMENTO (Modo RAG)
 
-        # Remove caracteres CID (comuns em PDFs)
-        text = re.sub(r"\(cid:\d+\)", "•", text)
+**Sua pergunta:** {question}
+
+**Trechos mais relevantes do documento:**
 
-        # Remove múltiplos espaços
-        text = re.sub(r" +", " ", text)
+"""
 
-        # Remove múltiplas quebras de linha (mantém no máximo 2)
-        text = re.sub(r"\n{3,}", "\n\n", text)
+        if not sentences:
+            response += "Não encontrei trechos relevantes para essa pergunta.\n\n"
 
-        return text.strip()
+        for sentence, page in sentences:
+            citation = f" _(p. {page})_" if page else ""
+            response += f"- {sentence}{citation}\n"
+
+        response += """
+---
+💡 **Nota:** Esta resposta mostra diretamente o conteúdo recuperado do documento.
+   Para respostas sintetizadas por IA, adicione créditos à sua conta OpenAI.
+"""
+
+        return response
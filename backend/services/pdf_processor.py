@@ -4,7 +4,50 @@ Responsável por extrair texto de PDFs e dividir em chunks para o RAG
 """
 
 import pdfplumber
-from typing import List, Tuple
+import re
+from collections import Counter
+from typing import List, Optional, Set, Tuple
+
+# ============================================================================
+# PADRÕES DE NORMALIZAÇÃO (compilados uma única vez)
+# ============================================================================
+
+# Caracteres CID (comuns em PDFs com fontes sem mapeamento unicode)
+CID_PATTERN = re.compile(r"\(cid:\d+\)")
+
+# Hífen na quebra de linha: "informa-\nção" -> "informação"
+HYPHENATION_PATTERN = re.compile(r"(\w+)-\n(\w+)")
+
+# Palavras (inclusive compostas com hífen) usadas como evidência na translineação
+WORD_PATTERN = re.compile(r"\w+(?:-\w+)*")
+
+# Múltiplos espaços/tabs
+SPACES_PATTERN = re.compile(r"[ \t]+")
+
+# Espaços no início/fim de cada linha
+LINE_EDGE_SPACES_PATTERN = re.compile(r" *\n *")
+
+# Múltiplas quebras de linha (mantém no máximo 2)
+NEWLINES_PATTERN = re.compile(r"\n{3,}")
+
+# Dígitos, usados para reconhecer cabeçalhos/rodapés com número de página
+DIGITS_PATTERN = re.compile(r"\d+")
+
+# Marcador de página inserido no texto: "[Página 3]"
+PAGE_MARKER_PATTERN = re.compile(r"\[Página (\d+)\]")
+
+# Ligaduras tipográficas -> letras separadas
+LIGATURES = str.maketrans(
+    {
+        "\ufb00": "ff",
+        "\ufb01": "fi",
+        "\ufb02": "fl",
+        "\ufb03": "ffi",
+        "\ufb04": "ffl",
+        "\ufb05": "st",
+        "\ufb06": "st",
+    }
+)
 
 
 class PDFProcessor:
@@ -12,16 +55,38 @@ class PDFProcessor:
     Classe para processar arquivos PDF e extrair texto
     """
 
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        normalize_text: bool = True,
+        repair_hyphenation: bool = True,
+        remove_headers_footers: bool = True,
+        header_footer_lines: int = 2,
+        header_footer_min_ratio: float = 0.5,
+    ):
         """
         Inicializa o processador de PDF
 
         Args:
             chunk_size: Tamanho de cada chunk em caracteres
             chunk_overlap: Sobreposição entre chunks (para manter contexto)
+            normalize_text: Limpa o texto (CID, ligaduras, espaços) na ingestão
+            repair_hyphenation: Junta palavras separadas por hífen na quebra de linha
+            remove_headers_footers: Remove linhas repetidas no topo/rodapé das páginas
+            header_footer_lines: Quantas linhas do topo e do rodapé são analisadas
+            header_footer_min_ratio: Fração mínima de páginas em que a linha deve se repetir
         """
+        if header_footer_lines < 1:
+            raise ValueError("header_footer_lines deve ser maior ou igual a 1")
+
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.normalize_text = normalize_text
+        self.repair_hyphenation = repair_hyphenation
+        self.remove_headers_footers = remove_headers_footers
+        self.header_footer_lines = header_footer_lines
+        self.header_footer_min_ratio = header_footer_min_ratio
 
     def process_pdf(self, pdf_path: str) -> Tuple[List[str], int]:
         """
@@ -35,31 +100,172 @@ class PDFProcessor:
         """
 
         # Extrai texto de todas as páginas
-        full_text = ""
         num_pages = 0
 
         with pdfplumber.open(pdf_path) as pdf:
             num_pages = len(pdf.pages)
+            pages = [page.extract_text() or "" for page in pdf.pages]
 
-            for page_num, page in enumerate(pdf.pages, 1):
-                # Extrai texto da página
-                text = page.extract_text()
+        # Normaliza o texto uma única vez, antes de chunking e embeddings
+        if self.normalize_text:
+            pages = self._normalize_pages(pages)
 
-                if text:
-                    # Adiciona marcador de página para rastreabilidade
-                    full_text += f"\n\n[Página {page_num}]\n{text}"
+        full_text = ""
+        for page_num, text in enumerate(pages, 1):
+            if text:
+                # Adiciona marcador de página para rastreabilidade
+                full_text += f"\n\n[Página {page_num}]\n{text}"
 
         # Divide o texto em chunks
         chunks = self._split_into_chunks(full_text)
 
         return chunks, num_pages
 
+    def _normalize_pages(self, pages: List[str]) -> List[str]:
+        """
+        Aplica a normalização em todas as páginas do documento
+
+        Cabeçalhos e rodapés só podem ser detectados olhando todas as
+        páginas juntas, por isso a normalização trabalha no documento inteiro.
+
+        Args:
+            pages: Texto bruto de cada página
+
+        Returns:
+            Texto normalizado de cada página
+        """
+        if self.remove_headers_footers:
+            pages = self._remove_headers_footers(pages)
+
+        vocabulary = self._build_vocabulary(pages) if self.repair_hyphenation else None
+
+        return [self._clean_text(text, vocabulary) for text in pages]
+
+    def _clean_text(self, text: str, vocabulary: Optional[Set[str]] = None) -> str:
+        """
+        Limpa o texto de uma página extraído do PDF
+
+        Args:
+            text: Texto a ser limpo
+            vocabulary: Palavras do documento inteiro, usadas para decidir a
+                translineação (padrão: apenas as palavras deste texto)
+
+        Returns:
+            Texto limpo e formatado
+        """
+        if not text:
+            return ""
+
+        text = text.translate(LIGATURES)
+        text = CID_PATTERN.sub("•", text)
+        if self.repair_hyphenation:
+            if vocabulary is None:
+                vocabulary = self._build_vocabulary([text])
+            text = HYPHENATION_PATTERN.sub(
+                lambda match: self._join_hyphenated(match, vocabulary), text
+            )
+        text = SPACES_PATTERN.sub(" ", text)
+        text = LINE_EDGE_SPACES_PATTERN.sub("\n", text)
+        text = NEWLINES_PATTERN.sub("\n\n", text)
+
+        return text.strip()
+
+    @staticmethod
+    def _build_vocabulary(pages: List[str]) -> Set[str]:
+        """
+        Coleta as palavras do documento que não estão partidas na quebra de linha
+
+        Args:
+            pages: Texto de cada página
+
+        Returns:
+            Conjunto de palavras em minúsculas (compostas mantêm o hífen)
+        """
+        vocabulary = set()
+        for text in pages:
+            text = HYPHENATION_PATTERN.sub(" ", text.translate(LIGATURES))
+            vocabulary.update(word.lower() for word in WORD_PATTERN.findall(text))
+        return vocabulary
+
+    @staticmethod
+    def _join_hyphenated(match: re.Match, vocabulary: Set[str]) -> str:
+        """
+        Decide se um hífen na quebra de linha é translineação ou hífen real
+
+        Sem dicionário, a decisão usa o próprio documento como evidência: só
+        junta quando a forma unida ("informação") aparece em outro ponto do
+        texto e a forma com hífen ("guarda-chuva") não. Na dúvida mantém o
+        hífen, removendo apenas a quebra de linha, pois "guardachuva" altera
+        a palavra e "informa-ção" apenas a separa.
+        """
+        before, after = match.group(1), match.group(2)
+        joined = f"{before}{after}"
+        hyphenated = f"{before}-{after}"
+        if (
+            after[0].islower()
+            and joined.lower() in vocabulary
+            and hyphenated.lower() not in vocabulary
+        ):
+            return joined
+        return hyphenated
+
+    def _remove_headers_footers(self, pages: List[str]) -> List[str]:
+        """
+        Remove linhas que se repetem no topo ou rodapé da maioria das páginas
+
+        Números são ignorados na comparação para que "Página 3 de 10" e
+        "Página 4 de 10" sejam reconhecidos como o mesmo rodapé.
+
+        Args:
+            pages: Texto de cada página
+
+        Returns:
+            Texto de cada página sem cabeçalhos/rodapés repetidos
+        """
+        # Com poucas páginas não há como distinguir repetição de conteúdo
+        if len(pages) < 3:
+            return pages
+
+        n = self.header_footer_lines
+        pages_lines = [text.split("\n") for text in pages]
+
+        # Conta em quantas páginas cada linha (sem dígitos) aparece nas bordas
+        counts = Counter()
+        for lines in pages_lines:
+            edges = lines[:n] + lines[-n:]
+            counts.update(set(self._edge_key(line) for line in edges))
+
+        min_pages = max(2, len(pages) * self.header_footer_min_ratio)
+        repeated = {key for key, count in counts.items() if key and count >= min_pages}
+
+        if not repeated:
+            return pages
+
+        cleaned = []
+        for lines in pages_lines:
+            top = [line for line in lines[:n] if self._edge_key(line) not in repeated]
+            body = lines[n:-n] if len(lines) > 2 * n else []
+            bottom = lines[n:][-n:] if len(lines) > n else []
+            bottom = [line for line in bottom if self._edge_key(line) not in repeated]
+            cleaned.append("\n".join(top + body + bottom))
+
+        return cleaned
+
+    @staticmethod
+    def _edge_key(line: str) -> str:
+        """
+        Chave de comparação de uma linha de cabeçalho/rodapé
+        """
+        return DIGITS_PATTERN.sub("#", line.strip().lower())
+
     def _split_into_chunks(self, text: str) -> List[str]:
         """
         Divide o texto em chunks com sobreposição
 
         A sobreposição é importante para manter o contexto entre chunks,
-        evitando que informações importantes sejam cortadas.
+        evitando que informações importantes sejam cortadas. Chunks que
+        começam no meio de uma página recebem o marcador dessa página,
+        para que toda frase possa ser citada com a página de origem.
 
         Args:
             text: Texto completo a ser dividido
@@ -70,6 +276,7 @@ class PDFProcessor:
         chunks = []
         start = 0
         text_length = len(text)
+        markers = [(m.start(), m.group(0)) for m in PAGE_MARKER_PATTERN.finditer(text)]
 
         while start < text_length:
             # Define o fim do chunk
@@ -86,9 +293,32 @@ class PDFProcessor:
             chunk = text[start:end].strip()
 
             if chunk:  # Adiciona apenas chunks não vazios
+                if not PAGE_MARKER_PATTERN.match(chunk):
+                    page_marker = self._page_marker_at(markers, start)
+                    if page_marker:
+                        chunk = f"{page_marker}\n{chunk}"
                 chunks.append(chunk)
 
             # Move o início para o próximo chunk (com sobreposição)
             start = end - self.chunk_overlap
 
         return chunks
+
+    @staticmethod
+    def _page_marker_at(markers: List[Tuple[int, str]], position: int) -> str:
+        """
+        Retorna o marcador da página que contém a posição informada
+
+        Args:
+            markers: Lista de (posição, marcador) em ordem crescente
+            position: Posição no texto completo
+
+        Returns:
+            Marcador "[Página N]" ou string vazia se não houver
+        """
+        page_marker = ""
+        for marker_position, marker in markers:
+            if marker_position > position:
+                break
+            page_marker = marker
+        return page_marker
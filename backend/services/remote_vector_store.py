@@ -0,0 +1,143 @@
+"""
+SERVIÇO DE VECTOR STORE REMOTO
+Cliente HTTP para o serviço de índice compartilhado (index_service.py)
+
+Usado quando a API roda com vários workers: cada worker delega embeddings,
+buscas e escritas para um único processo dono do modelo e do índice.
+"""
+
+from typing import List, Dict, Optional, Tuple
+import httpx
+
+
+class RemoteVectorStore:
+    """
+    Cliente do serviço de índice compartilhado
+
+    Expõe a mesma interface do VectorStoreManager, permitindo que os
+    workers da API sejam trocados entre modo local e modo compartilhado
+    sem mudanças nos endpoints.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 30.0,
+        write_timeout: Optional[float] = 600.0,
+    ):
+        """
+        Inicializa o cliente do serviço de índice
+
+        Args:
+            base_url: URL do serviço de índice (ex: http://127.0.0.1:8001)
+            timeout: Tempo máximo (em segundos) de buscas e leituras
+            write_timeout: Tempo máximo (em segundos) da ingestão; None = sem limite
+        """
+        self.base_url = base_url.rstrip("/")
+
+        # Criar embeddings de um PDF grande na CPU do serviço pode levar minutos
+        self.write_timeout = write_timeout
+
+        # Um único cliente por processo reaproveita as conexões HTTP
+        self.http = httpx.Client(base_url=self.base_url, timeout=timeout)
+        print(f"🔗 Usando serviço de índice compartilhado em {self.base_url}")
+
+    def add_documents(self, chunks: List[str], source: str):
+        """
+        Envia documentos para o dono do índice (todas as escritas passam por ele)
+
+        A ingestão no serviço é idempotente por fonte, então reenviar após
+        um timeout substitui o documento em vez de duplicá-lo.
+
+        Args:
+            chunks: Lista de chunks de texto
+            source: Nome do arquivo fonte
+        """
+        response = self.http.post(
+            "/index/documents",
+            json={"chunks": chunks, "source": source},
+            timeout=self.write_timeout,
+        )
+        response.raise_for_status()
+
+    def search(self, query: str, k: int = 3) -> List[Dict]:
+        """
+        Busca os chunks mais relevantes no serviço de índice
+
+        Args:
+            query: Pergunta do usuário
+            k: Número de resultados a retornar
+
+        Returns:
+            Lista de dicionários com texto, fonte e score de similaridade
+        """
+        results, _ = self.search_with_embedding(query, k)
+        return results
+
+    def search_with_embedding(
+        self, query: str, k: int = 3
+    ) -> Tuple[List[Dict], List[float]]:
+        """
+        Busca os chunks mais relevantes e retorna também o embedding da query
+
+        Args:
+            query: Pergunta do usuário
+            k: Número de resultados a retornar
+
+        Returns:
+            Tupla contendo (resultados da busca, embedding da query)
+        """
+        response = self.http.post("/index/search", json={"query": query, "k": k})
+        response.raise_for_status()
+        data = response.json()
+        return data["results"], data["query_embedding"]
+
+    def search_sentences(
+        self, query_embedding: List[float], chunk_ids: List[str], k: int = 20
+    ) -> List[Dict]:
+        """
+        Busca as frases mais próximas da pergunta no serviço de índice
+
+        Args:
+            query_embedding: Embedding da pergunta
+            chunk_ids: IDs dos chunks recuperados na busca
+            k: Número máximo de frases a retornar
+
+        Returns:
+            Lista de dicionários com texto, página e similaridade
+        """
+        response = self.http.post(
+            "/index/sentences",
+            json={"query_embedding": query_embedding, "chunk_ids": chunk_ids, "k": k},
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def get_document_count(self) -> int:
+        """
+        Retorna o número de chunks armazenados no serviço de índice
+
+        Returns:
+            Número de documentos/chunks
+        """
+        response = self.http.get("/index/count")
+        response.raise_for_status()
+        return response.json()["count"]
+
+    def list_documents(self) -> List[str]:
+        """
+        Lista todos os documentos únicos no serviço de índice
+
+        Returns:
+            Lista de nomes de arquivos
+        """
+        response = self.http.get("/index/documents")
+        response.raise_for_status()
+        return response.json()
+
+    def clear(self):
+        """
+        Remove todos os documentos do serviço de índice
+        """
+        response = self.http.delete("/index/documents")
+        response.raise_for_status()
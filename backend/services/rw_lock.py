@@ -0,0 +1,58 @@
+"""
+LOCK DE LEITURA/ESCRITA
+Protege o vector store contra buscas concorrentes com escritas
+"""
+
+from contextlib import contextmanager
+import threading
+
+
+class ReadWriteLock:
+    """
+    Lock de leitura/escrita
+
+    Várias leituras (buscas) rodam em paralelo; uma escrita (troca de
+    chunks ou limpeza, que recria as coleções) roda sozinha. Escritores
+    pendentes têm prioridade para não ficarem esperando indefinidamente.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        """
+        Adquire o lock para leitura
+        """
+        with self._condition:
+            while self._writer or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        """
+        Adquire o lock para escrita (exclusivo)
+        """
+        with self._condition:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
@@ -3,11 +3,23 @@ SERVIÇO DE VECTOR STORE
 Gerencia embeddings vetoriais e busca semântica usando ChromaDB
 """
 
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+import os
 import chromadb
 from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
 
+from services.embedding_batcher import EmbeddingBatcher
+from services.extractive_answer import split_sentences
+from services.rw_lock import ReadWriteLock
+
+# Distância por cosseno: a similaridade (1 - distância) fica entre -1 e 1,
+# permitindo um score mínimo estável no modo extrativo
+SENTENCE_COLLECTION_METADATA = {
+    "description": "Frases dos chunks para respostas extrativas",
+    "hnsw:space": "cosine",
+}
+
 
 class VectorStoreManager:
     """
@@ -17,14 +29,33 @@ class VectorStoreManager:
     para criar embeddings dos textos.
     """
 
-    def __init__(self, collection_name: str = "documents"):
+    def __init__(
+        self,
+        collection_name: str = "documents",
+        batch_max_size: Optional[int] = None,
+        batch_max_wait_ms: Optional[float] = None,
+        batch_timeout: Optional[float] = None,
+    ):
         """
         Inicializa o vector store
 
         Args:
             collection_name: Nome da coleção no ChromaDB
+            batch_max_size: Máximo de perguntas por lote de embeddings de query
+                (padrão: variável EMBEDDING_BATCH_MAX_SIZE ou 32)
+            batch_max_wait_ms: Janela (em ms) para agrupar perguntas concorrentes
+                (padrão: variável EMBEDDING_BATCH_MAX_WAIT_MS ou 5)
+            batch_timeout: Tempo máximo (em segundos) esperando o embedding
+                de uma pergunta (padrão: variável EMBEDDING_BATCH_TIMEOUT ou 30)
         """
 
+        if batch_max_size is None:
+            batch_max_size = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32"))
+        if batch_max_wait_ms is None:
+            batch_max_wait_ms = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5"))
+        if batch_timeout is None:
+            batch_timeout = float(os.getenv("EMBEDDING_BATCH_TIMEOUT", "30"))
+
         # Inicializa o ChromaDB em memória (para desenvolvimento)
         # Em produção, use persist_directory para salvar em disco
         self.client = chromadb.Client(
@@ -37,19 +68,43 @@ class VectorStoreManager:
             metadata={"description": "Coleção de documentos para RAG"},
         )
 
+        # Frases de cada chunk, com embeddings criados na ingestão, para que
+        # o modo extrativo (sem LLM) não precise chamar o modelo por pergunta
+        self.sentence_collection = self.client.get_or_create_collection(
+            name=f"{collection_name}_sentences",
+            metadata=SENTENCE_COLLECTION_METADATA,
+        )
+
         # Inicializa o modelo de embeddings
         # all-MiniLM-L6-v2 é um modelo leve e eficiente para embeddings
         print("🔄 Carregando modelo de embeddings...")
         self.embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
         print("✅ Modelo carregado!")
 
-        # Contador para IDs únicos
-        self.doc_counter = 0
+        # Buscas rodam em paralelo; a troca de chunks e a limpeza (que recria
+        # as coleções) rodam sozinhas. Os endpoints chamam este objeto em
+        # paralelo pelo threadpool, tanto na API quanto no index_service.
+        self._lock = ReadWriteLock()
+
+        # Agrupa embeddings de perguntas concorrentes em um único encode()
+        self.query_batcher = EmbeddingBatcher(
+            self.embedding_model,
+            max_batch_size=batch_max_size,
+            max_wait_ms=batch_max_wait_ms,
+            timeout=batch_timeout,
+        )
 
     def add_documents(self, chunks: List[str], source: str):
         """
         Adiciona documentos ao vector store
 
+        A ingestão é idempotente: os IDs derivam do nome do arquivo e os
+        chunks anteriores da mesma fonte são substituídos, então reenviar
+        o mesmo documento (ex: retry após timeout) não o duplica.
+
+        Os embeddings (a parte lenta) são criados sem lock; só a troca dos
+        chunks no ChromaDB bloqueia as buscas.
+
         Args:
             chunks: Lista de chunks de texto
             source: Nome do arquivo fonte
@@ -59,18 +114,64 @@ class VectorStoreManager:
         print(f"🔄 Criando embeddings para {len(chunks)} chunks...")
         embeddings = self.embedding_model.encode(chunks).tolist()
 
-        # Prepara IDs e metadados
-        ids = [f"doc_{self.doc_counter}_{i}" for i in range(len(chunks))]
+        # Prepara IDs (derivados da fonte) e metadados
+        ids = [f"{source}::{i}" for i in range(len(chunks))]
         metadatas = [{"source": source, "chunk_id": i} for i in range(len(chunks))]
 
-        # Adiciona ao ChromaDB
-        self.collection.add(
-            embeddings=embeddings, documents=chunks, metadatas=metadatas, ids=ids
-        )
+        sentences = self._prepare_sentences(chunks, ids, source)
+
+        with self._lock.write():
+            # Substitui uma versão anterior do mesmo documento, se houver
+            self.collection.delete(where={"source": source})
+            self.sentence_collection.delete(where={"source": source})
+
+            # Adiciona ao ChromaDB
+            self.collection.add(
+                embeddings=embeddings, documents=chunks, metadatas=metadatas, ids=ids
+            )
+            if sentences:
+                self.sentence_collection.add(**sentences)
 
-        self.doc_counter += 1
         print(f"✅ {len(chunks)} chunks adicionados ao vector store!")
 
+    def _prepare_sentences(
+        self, chunks: List[str], chunk_ids: List[str], source: str
+    ) -> Optional[Dict]:
+        """
+        Divide os chunks em frases e cria seus embeddings
+
+        Args:
+            chunks: Lista de chunks de texto
+            chunk_ids: IDs dos chunks no ChromaDB
+            source: Nome do arquivo fonte
+
+        Returns:
+            Argumentos para sentence_collection.add, ou None se não há frases
+        """
+        sentences, ids, metadatas = [], [], []
+
+        for chunk, chunk_id in zip(chunks, chunk_ids):
+            for j, (sentence, page) in enumerate(split_sentences(chunk)):
+                sentences.append(sentence)
+                ids.append(f"{chunk_id}::{j}")
+                # Metadados do ChromaDB não aceitam None: 0 = página desconhecida
+                metadatas.append(
+                    {"source": source, "chunk": chunk_id, "page": page or 0}
+                )
+
+        if not sentences:
+            return None
+
+        print(f"🔄 Criando embeddings para {len(sentences)} frases...")
+        embeddings = self.embedding_model.encode(sentences).tolist()
+
+        return {
+            "embeddings": embeddings,
+            "documents": sentences,
+            "metadatas": metadatas,
+            "ids": ids,
+        }
+
     def search(self, query: str, k: int = 3) -> List[Dict]:
         """
         Busca os chunks mais relevantes para uma query
@@ -82,12 +183,34 @@ class VectorStoreManager:
         Returns:
             Lista de dicionários com texto, fonte e score de similaridade
         """
+        results, _ = self.search_with_embedding(query, k)
+        return results
+
+    def search_with_embedding(
+        self, query: str, k: int = 3
+    ) -> Tuple[List[Dict], List[float]]:
+        """
+        Busca os chunks mais relevantes e retorna também o embedding da query
+
+        O embedding é reaproveitado pelo modo extrativo (sem LLM) para
+        pontuar frases sem calcular o vetor da pergunta novamente.
+
+        Args:
+            query: Pergunta do usuário
+            k: Número de resultados a retornar
+
+        Returns:
+            Tupla contendo (resultados da busca, embedding da query)
+        """
 
-        # Cria embedding da query
-        query_embedding = self.embedding_model.encode([query]).tolist()
+        # Cria embedding da query (em lote com outras perguntas concorrentes)
+        query_embedding = self.query_batcher.encode(query)
 
         # Busca no ChromaDB
-        results = self.collection.query(query_embeddings=query_embedding, n_results=k)
+        with self._lock.read():
+            results = self.collection.query(
+                query_embeddings=[query_embedding], n_results=k
+            )
 
         # Formata os resultados
         formatted_results = []
@@ -96,6 +219,7 @@ class VectorStoreManager:
             for i, doc in enumerate(results["documents"][0]):
                 formatted_results.append(
                     {
+                        "id": results["ids"][0][i],
                         "text": doc,
                         "source": results["metadatas"][0][i]["source"],
                         "score": 1
@@ -105,7 +229,47 @@ class VectorStoreManager:
                     }
                 )
 
-        return formatted_results
+        return formatted_results, query_embedding
+
+    def search_sentences(
+        self, query_embedding: List[float], chunk_ids: List[str], k: int = 20
+    ) -> List[Dict]:
+        """
+        Busca as frases mais próximas da pergunta dentro dos chunks recuperados
+
+        Usa o embedding da query já calculado na busca e os embeddings de
+        frases criados na ingestão: nenhuma chamada ao modelo é feita aqui.
+
+        Args:
+            query_embedding: Embedding da pergunta
+            chunk_ids: IDs dos chunks recuperados na busca
+            k: Número máximo de frases a retornar
+
+        Returns:
+            Lista de dicionários com texto, página e similaridade (cosseno)
+        """
+        if not chunk_ids:
+            return []
+
+        with self._lock.read():
+            results = self.sentence_collection.query(
+                query_embeddings=[query_embedding],
+                n_results=k,
+                where={"chunk": {"$in": chunk_ids}},
+            )
+
+        sentences = []
+        if results["documents"] and results["documents"][0]:
+            for i, doc in enumerate(results["documents"][0]):
+                sentences.append(
+                    {
+                        "text": doc,
+                        "page": results["metadatas"][0][i]["page"] or None,
+                        "score": 1 - results["distances"][0][i],
+                    }
+                )
+
+        return sentences
 
     def get_document_count(self) -> int:
         """
@@ -114,7 +278,8 @@ class VectorStoreManager:
         Returns:
             Número de documentos/chunks
         """
-        return self.collection.count()
+        with self._lock.read():
+            return self.collection.count()
 
     def list_documents(self) -> List[str]:
         """
@@ -123,7 +288,8 @@ class VectorStoreManager:
         Returns:
             Lista de nomes de arquivos
         """
-        all_docs = self.collection.get()
+        with self._lock.read():
+            all_docs = self.collection.get()
 
         if not all_docs["metadatas"]:
             return []
@@ -135,10 +301,19 @@ class VectorStoreManager:
     def clear(self):
         """
         Remove todos os documentos do vector store
+
+        Roda com o lock de escrita: nenhuma busca usa as coleções antigas
+        enquanto elas são apagadas e recriadas.
         """
-        self.client.delete_collection(self.collection.name)
-        self.collection = self.client.create_collection(
-            name=self.collection.name,
-            metadata={"description": "Coleção de documentos para RAG"},
-        )
-        self.doc_counter = 0
+        with self._lock.write():
+            self.client.delete_collection(self.collection.name)
+            self.collection = self.client.create_collection(
+                name=self.collection.name,
+                metadata={"description": "Coleção de documentos para RAG"},
+            )
+
+            self.client.delete_collection(self.sentence_collection.name)
+            self.sentence_collection = self.client.create_collection(
+                name=self.sentence_collection.name,
+                metadata=SENTENCE_COLLECTION_METADATA,
+            )
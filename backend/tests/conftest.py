@@ -0,0 +1,8 @@
+"""
+Configuração dos testes: permite importar os módulos do backend (services, tests)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
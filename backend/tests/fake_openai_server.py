@@ -0,0 +1,116 @@
+"""
+SERVIDOR OPENAI FAKE (para testes locais)
+Simula /v1/chat/completions com latência e taxa de erros configuráveis,
+para exercitar timeouts, retries, hedging e circuit breaker do LLMService.
+
+Usado pelos testes (tests/test_llm_service.py) e para testes manuais.
+
+Uso (a partir da pasta backend):
+    python -m tests.fake_openai_server --latency 0.2 --slow-rate 0.1 --error-rate 0.2
+
+    OPENAI_API_KEY=fake OPENAI_BASE_URL=http://127.0.0.1:9000/v1 python main.py
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import random
+import threading
+import time
+
+
+def make_handler(args):
+    """
+    Cria o handler HTTP com a configuração da linha de comando
+    """
+
+    class FakeOpenAIHandler(BaseHTTPRequestHandler):
+        # Número de requisições recebidas (consultado pelos testes)
+        request_count = 0
+        count_lock = threading.Lock()
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+
+            with self.count_lock:
+                type(self).request_count += 1
+
+            if not self.path.endswith("/chat/completions"):
+                return self._send(404, {"error": {"message": "Not found"}})
+
+            # Algumas requisições ficam lentas (cauda de latência)
+            latency = args.latency
+            if random.random() < args.slow_rate:
+                latency = args.slow_latency
+            time.sleep(latency)
+
+            if random.random() < args.error_rate:
+                return self._send(
+                    args.error_status,
+                    {
+                        "error": {
+                            "message": "Erro simulado",
+                            "type": "server_error",
+                            "code": args.error_code,
+                        }
+                    },
+                )
+
+            self._send(
+                200,
+                {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "fake"),
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {
+                                "role": "assistant",
+                                "content": f"Resposta fake ({body.get('model')})",
+                            },
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {
+                        "prompt_tokens": 10,
+                        "completion_tokens": 5,
+                        "total_tokens": 15,
+                    },
+                },
+            )
+
+        def _send(self, status: int, payload: dict):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *log_args):
+            print(f"🧪 {self.command} {self.path} - {format % log_args}")
+
+    return FakeOpenAIHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-latency", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--error-code", default=None)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args))
+    print(f"🧪 OpenAI fake em http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Testes do EmbeddingBatcher com um modelo stub (sem sentence-transformers)
+
+Uso (a partir da pasta backend):
+    python -m pytest -q tests
+"""
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import threading
+import time
+
+import pytest
+
+from services.embedding_batcher import EmbeddingBatcher
+
+
+class StubVectors(list):
+    """
+    Lista com tolist(), imitando o array retornado pelo SentenceTransformer
+    """
+
+    def tolist(self):
+        return list(self)
+
+
+class StubModel:
+    """
+    Modelo stub: o vetor de cada texto é [int(texto)]; registra os lotes
+    """
+
+    def __init__(self, latency=0.0, error=None, release=None):
+        self.latency = latency
+        self.error = error
+        self.release = release
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def encode(self, texts):
+        with self.lock:
+            self.batches.append(list(texts))
+        if self.release is not None:
+            self.release.wait()
+        time.sleep(self.latency)
+        if self.error is not None:
+            raise self.error
+        return StubVectors([float(text)] for text in texts)
+
+
+def test_concurrent_callers_are_batched_and_get_their_own_vector():
+    model = StubModel(latency=0.01)
+    batcher = EmbeddingBatcher(model, max_batch_size=8, max_wait_ms=5)
+
+    with ThreadPoolExecutor(max_workers=50) as executor:
+        results = list(executor.map(lambda i: batcher.encode(str(i)), range(200)))
+
+    assert results == [[float(i)] for i in range(200)]
+    assert all(len(batch) <= 8 for batch in model.batches)
+    assert max(len(batch) for batch in model.batches) > 1
+    assert sum(len(batch) for batch in model.batches) == 200
+
+
+def test_model_exception_reaches_every_caller_in_the_batch():
+    release = threading.Event()
+    model = StubModel(error=ValueError("modelo falhou"), release=release)
+    batcher = EmbeddingBatcher(model, max_batch_size=8, max_wait_ms=50)
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [executor.submit(batcher.encode, str(i)) for i in range(5)]
+        time.sleep(0.1)
+        release.set()
+
+        for future in futures:
+            with pytest.raises(ValueError, match="modelo falhou"):
+                future.result(timeout=2)
+
+    # A thread de processamento continua viva depois do erro
+    model.error = None
+    assert batcher.encode("7") == [7.0]
+
+
+def test_wrong_number_of_embeddings_fails_callers_instead_of_hanging():
+    model = StubModel()
+    model.encode = lambda texts: StubVectors([])
+    batcher = EmbeddingBatcher(model, timeout=2)
+
+    with pytest.raises(RuntimeError, match="0 embeddings"):
+        batcher.encode("1")
+
+
+def test_single_request_on_idle_queue_does_not_wait_the_window():
+    model = StubModel()
+    batcher = EmbeddingBatcher(model, max_batch_size=32, max_wait_ms=500)
+
+    start = time.monotonic()
+    assert batcher.encode("3") == [3.0]
+
+    assert time.monotonic() - start < 0.25
+
+
+def test_encode_times_out_when_model_is_stuck():
+    release = threading.Event()
+    model = StubModel(release=release)
+    batcher = EmbeddingBatcher(model, timeout=0.05)
+
+    with pytest.raises(FutureTimeoutError):
+        batcher.encode("1")
+
+    release.set()
+    assert batcher.encode("2") == [2.0]
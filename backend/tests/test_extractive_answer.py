@@ -0,0 +1,155 @@
+"""
+Testes do modo extrativo (RAG sem IA): divisão em frases, pontuação e
+busca de frases por embedding no VectorStoreManager
+
+Uso (a partir da pasta backend):
+    python -m pytest -q tests
+"""
+
+import pytest
+
+from services.extractive_answer import ExtractiveAnswerer, split_sentences
+from services.llm_service import LLMService
+
+CHUNK = (
+    "[Página 2]\n"
+    "O orçamento total do projeto foi de dois milhões de reais. Curto.\n"
+    "A equipe tinha doze pessoas trabalhando\nem tempo integral.\n\n"
+    "[Página 3]\n"
+    "O prazo de entrega do projeto foi prorrogado para dezembro."
+)
+
+# ============================================================================
+# DIVISÃO EM FRASES
+# ============================================================================
+
+
+def test_split_sentences_tracks_the_page_of_each_sentence():
+    sentences = split_sentences(CHUNK)
+
+    assert sentences == [
+        ("O orçamento total do projeto foi de dois milhões de reais.", 2),
+        ("A equipe tinha doze pessoas trabalhando em tempo integral.", 2),
+        ("O prazo de entrega do projeto foi prorrogado para dezembro.", 3),
+    ]
+
+
+def test_split_sentences_without_marker_has_no_page():
+    sentences = split_sentences("Um chunk sem nenhum marcador de página.")
+
+    assert sentences == [("Um chunk sem nenhum marcador de página.", None)]
+
+
+# ============================================================================
+# PONTUAÇÃO
+# ============================================================================
+
+
+def test_lexical_only_fallback_without_sentence_search():
+    answerer = ExtractiveAnswerer(max_sentences=1)
+
+    best = answerer.answer("Qual o prazo de entrega?", [{"text": CHUNK}])
+
+    assert best == [("O prazo de entrega do projeto foi prorrogado para dezembro.", 3)]
+
+
+def test_lexical_only_fallback_when_query_embedding_is_missing():
+    calls = []
+    answerer = ExtractiveAnswerer(
+        sentence_search_fn=lambda *args: calls.append(args) or [],
+        max_sentences=1,
+    )
+
+    best = answerer.answer("Qual o orçamento?", [{"text": CHUNK, "id": "a.pdf::0"}])
+
+    assert calls == []
+    assert best[0][1] == 2
+
+
+def test_sentence_search_scores_are_combined_and_filtered():
+    candidates = [
+        {"text": "O orçamento foi de dois milhões.", "page": 2, "score": 0.9},
+        {"text": "O orçamento foi de dois milhões.", "page": 4, "score": 0.8},
+        {"text": "Frase sem relação nenhuma com nada.", "page": 5, "score": 0.1},
+    ]
+    calls = []
+
+    def search(query_embedding, chunk_ids, k):
+        calls.append((chunk_ids, k))
+        return candidates
+
+    answerer = ExtractiveAnswerer(sentence_search_fn=search, max_candidates=7)
+
+    best = answerer.answer(
+        "Qual o orçamento?", [{"text": CHUNK, "id": "a.pdf::0"}], [0.1, 0.2]
+    )
+
+    assert calls == [(["a.pdf::0"], 7)]
+    # Frase repetida é deduplicada e a irrelevante fica abaixo do min_score
+    assert best == [("O orçamento foi de dois milhões.", 2)]
+
+
+def test_min_score_produces_not_found_message(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    service = LLMService()
+
+    answer, tokens = service.generate_answer(
+        "Quem ganhou a copa de futebol?", CHUNK, chunks=[{"text": CHUNK}]
+    )
+
+    assert tokens == 0
+    assert "Não encontrei trechos relevantes para essa pergunta." in answer
+    assert "orçamento" not in answer
+
+
+# ============================================================================
+# BUSCA DE FRASES NO VECTOR STORE
+# ============================================================================
+
+
+class StubEncoder:
+    """
+    Encoder stub: um eixo por palavra do vocabulário, vetores normalizados
+    """
+
+    VOCABULARY = ["orçamento", "prazo", "equipe", "milhões", "dezembro", "pessoas"]
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def encode(self, texts):
+        import numpy as np
+
+        vectors = []
+        for text in texts:
+            text = text.lower()
+            vector = np.array(
+                [1.0 if word in text else 0.0 for word in self.VOCABULARY] + [0.01]
+            )
+            vectors.append(vector / np.linalg.norm(vector))
+        return np.array(vectors)
+
+
+def test_search_sentences_is_restricted_to_the_given_chunks(monkeypatch):
+    pytest.importorskip("chromadb")
+    pytest.importorskip("sentence_transformers")
+    from services import vector_store
+
+    monkeypatch.setattr(vector_store, "SentenceTransformer", StubEncoder)
+    store = vector_store.VectorStoreManager(collection_name="test_sentences")
+    store.clear()
+    store.add_documents(
+        [
+            "[Página 1]\nO orçamento do projeto A foi de dois milhões.",
+            "[Página 2]\nO orçamento do projeto B foi de três milhões.",
+        ],
+        "a.pdf",
+    )
+    query_embedding = StubEncoder().encode(["orçamento"])[0].tolist()
+
+    sentences = store.search_sentences(query_embedding, ["a.pdf::1"], k=5)
+
+    assert [sentence["page"] for sentence in sentences] == [2]
+    assert sentences[0]["text"] == "O orçamento do projeto B foi de três milhões."
+    assert 0 < sentences[0]["score"] <= 1
+    assert store.search_sentences(query_embedding, [], k=5) == []
@@ -0,0 +1,244 @@
+"""
+Testes da camada resiliente do LLMService (retries, circuit breaker, hedging
+e roteamento de modelos) contra o servidor OpenAI fake e um cliente stub.
+
+Uso (a partir da pasta backend):
+    python -m pytest -q tests
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+from types import SimpleNamespace
+import threading
+import time
+
+import pytest
+
+from services.llm_service import LLMService
+from tests.fake_openai_server import make_handler
+
+CONTEXT = "[Página 1]\nO orçamento total do projeto foi de dois milhões de reais."
+
+
+@pytest.fixture
+def fake_openai():
+    """
+    Sobe o servidor fake em uma porta livre; a configuração é mutável
+    """
+    config = SimpleNamespace(
+        latency=0.0,
+        slow_rate=0.0,
+        slow_latency=0.0,
+        error_rate=0.0,
+        error_status=500,
+        error_code=None,
+    )
+    handler = make_handler(config)
+    handler.log_message = lambda *args: None
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield SimpleNamespace(
+        url=f"http://127.0.0.1:{server.server_address[1]}/v1",
+        config=config,
+        handler=handler,
+    )
+
+    server.shutdown()
+    server.server_close()
+
+
+def make_service(monkeypatch, base_url="http://127.0.0.1:9/v1", **env):
+    """
+    Cria o LLMService com a configuração de ambiente informada
+    """
+    monkeypatch.setenv("OPENAI_API_KEY", "fake")
+    monkeypatch.setenv("OPENAI_BASE_URL", base_url)
+    monkeypatch.setenv("LLM_BACKOFF_BASE", "0.001")
+    monkeypatch.setenv("LLM_TIMEOUT", "5")
+    for name, value in env.items():
+        monkeypatch.setenv(name, str(value))
+    return LLMService()
+
+
+class StubClient:
+    """
+    Cliente OpenAI stub com latências roteirizadas, para testar hedging
+    """
+
+    def __init__(self, latencies):
+        self.latencies = list(latencies)
+        self.calls = 0
+        self.lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **request):
+        with self.lock:
+            index = self.calls
+            self.calls += 1
+            latency = self.latencies[min(index, len(self.latencies) - 1)]
+        time.sleep(latency)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=f"call {index}"))],
+            usage=SimpleNamespace(total_tokens=15),
+        )
+
+
+# ============================================================================
+# RETRIES E CIRCUIT BREAKER
+# ============================================================================
+
+
+def test_transient_errors_are_retried_then_fall_back(monkeypatch, fake_openai):
+    fake_openai.config.error_rate = 1.0
+    service = make_service(monkeypatch, fake_openai.url, LLM_MAX_RETRIES=2)
+
+    answer, tokens = service.generate_answer("Qual o orçamento?", CONTEXT)
+
+    assert fake_openai.handler.request_count == 3
+    assert tokens == 0
+    assert answer.startswith("📄 RESPOSTA BASEADA NO DOCUMENTO")
+
+
+def test_successful_call_returns_llm_answer(monkeypatch, fake_openai):
+    service = make_service(monkeypatch, fake_openai.url)
+
+    answer, tokens = service.generate_answer("Qual o orçamento?", CONTEXT)
+
+    assert answer.startswith("Resposta fake")
+    assert tokens == 15
+
+
+@pytest.mark.parametrize(
+    "status, code",
+    [(400, "context_length_exceeded"), (401, None), (429, "insufficient_quota")],
+)
+def test_client_errors_are_not_retried_nor_open_breaker(
+    monkeypatch, fake_openai, status, code
+):
+    fake_openai.config.error_rate = 1.0
+    fake_openai.config.error_status = status
+    fake_openai.config.error_code = code
+    service = make_service(
+        monkeypatch, fake_openai.url, LLM_MAX_RETRIES=2, LLM_BREAKER_FAILURES=3
+    )
+
+    for _ in range(5):
+        _, tokens = service.generate_answer("Qual o orçamento?", CONTEXT)
+        assert tokens == 0
+
+    assert fake_openai.handler.request_count == 5
+    assert service.breaker.state == "closed"
+
+
+def test_breaker_opens_and_skips_upstream(monkeypatch, fake_openai):
+    fake_openai.config.error_rate = 1.0
+    service = make_service(
+        monkeypatch,
+        fake_openai.url,
+        LLM_MAX_RETRIES=0,
+        LLM_BREAKER_FAILURES=2,
+        LLM_BREAKER_RECOVERY=60,
+    )
+
+    for _ in range(5):
+        service.generate_answer("Qual o orçamento?", CONTEXT)
+
+    assert service.breaker.state == "open"
+    assert fake_openai.handler.request_count == 2
+
+
+def test_breaker_half_open_trial_closes_circuit(monkeypatch, fake_openai):
+    fake_openai.config.error_rate = 1.0
+    service = make_service(
+        monkeypatch,
+        fake_openai.url,
+        LLM_MAX_RETRIES=0,
+        LLM_BREAKER_FAILURES=1,
+        LLM_BREAKER_RECOVERY=0.1,
+    )
+    service.generate_answer("Qual o orçamento?", CONTEXT)
+    assert service.breaker.state == "open"
+
+    # OpenAI se recupera; após o recovery_timeout a chamada de teste passa
+    fake_openai.config.error_rate = 0.0
+    time.sleep(0.15)
+    _, tokens = service.generate_answer("Qual o orçamento?", CONTEXT)
+
+    assert tokens == 15
+    assert service.breaker.state == "closed"
+
+
+# ============================================================================
+# HEDGING
+# ============================================================================
+
+
+def test_hedge_wins_when_primary_is_slow(monkeypatch):
+    service = make_service(monkeypatch, LLM_HEDGE_AFTER=0.05)
+    service.client = StubClient([1.0, 0.01])
+
+    start = time.monotonic()
+    answer, _ = service.generate_answer("Qual o orçamento?", CONTEXT)
+
+    assert answer == "call 1"
+    assert time.monotonic() - start < 0.5
+
+
+def test_no_hedges_when_upstream_is_under_threshold(monkeypatch):
+    service = make_service(monkeypatch, LLM_HEDGE_AFTER=0.3)
+    service.client = StubClient([0.2])
+
+    with ThreadPoolExecutor(max_workers=20) as executor:
+        list(
+            executor.map(
+                lambda _: service.generate_answer("Qual o orçamento?", CONTEXT),
+                range(20),
+            )
+        )
+
+    assert service.client.calls == 20
+
+
+def test_hedge_budget_caps_extra_upstream_traffic(monkeypatch):
+    service = make_service(
+        monkeypatch,
+        LLM_HEDGE_AFTER=0.02,
+        LLM_HEDGE_MAX_WORKERS=4,
+        LLM_HEDGE_BUDGET=0.1,
+    )
+    service.client = StubClient([0.2])
+
+    with ThreadPoolExecutor(max_workers=40) as executor:
+        list(
+            executor.map(
+                lambda _: service.generate_answer("Qual o orçamento?", CONTEXT),
+                range(40),
+            )
+        )
+
+    # Fichas iniciais (tamanho do pool) + 10% das chamadas
+    assert service.client.calls <= 40 + 4 + 4
+
+
+# ============================================================================
+# ROTEAMENTO DE MODELOS
+# ============================================================================
+
+
+def test_small_prompts_go_to_fast_model(monkeypatch, fake_openai):
+    service = make_service(monkeypatch, fake_openai.url, LLM_FAST_MODEL="fast-model")
+
+    answer, _ = service.generate_answer("Qual o orçamento?", CONTEXT, max_tokens=500)
+
+    assert answer == "Resposta fake (fast-model)"
+
+
+def test_large_prompts_go_to_main_model(monkeypatch, fake_openai):
+    service = make_service(monkeypatch, fake_openai.url, LLM_FAST_MODEL="fast-model")
+
+    answer, _ = service.generate_answer("Qual?", CONTEXT * 100, max_tokens=500)
+
+    assert answer == "Resposta fake (gpt-3.5-turbo)"
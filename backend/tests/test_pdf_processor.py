@@ -0,0 +1,181 @@
+"""
+Testes da normalização e do chunking do PDFProcessor (sem abrir PDFs)
+
+Uso (a partir da pasta backend):
+    python -m pytest -q tests
+"""
+
+import pytest
+
+from services.pdf_processor import PAGE_MARKER_PATTERN, PDFProcessor
+
+# ============================================================================
+# CID, LIGADURAS E ESPAÇOS
+# ============================================================================
+
+
+def test_cid_and_ligatures_are_normalized():
+    processor = PDFProcessor()
+
+    text = processor._clean_text("(cid:12)  eﬃciente  \n  ﬁm\n\n\n\nﬂuxo")
+
+    assert text == "• efficiente\nfim\n\nfluxo"
+
+
+def test_normalization_can_be_disabled_per_step():
+    processor = PDFProcessor(repair_hyphenation=False)
+
+    assert processor._clean_text("informa-\nção") == "informa-\nção"
+
+
+# ============================================================================
+# TRANSLINEAÇÃO
+# ============================================================================
+
+
+def test_real_hyphens_are_kept_at_line_breaks():
+    processor = PDFProcessor(remove_headers_footers=False)
+
+    pages = processor._normalize_pages(
+        ["Levei o guarda-\nchuva, tomei um anti-\ninflamatório e fui bem-\nvindo."]
+    )
+
+    assert pages == [
+        "Levei o guarda-chuva, tomei um anti-inflamatório e fui bem-vindo."
+    ]
+
+
+def test_hyphenation_is_joined_when_the_document_uses_the_joined_form():
+    processor = PDFProcessor(remove_headers_footers=False)
+
+    pages = processor._normalize_pages(
+        ["A informa-\nção chegou.", "Outra informação importante."]
+    )
+
+    assert pages[0] == "A informação chegou."
+
+
+def test_hyphenated_form_elsewhere_wins_over_joined_form():
+    processor = PDFProcessor(remove_headers_footers=False)
+
+    pages = processor._normalize_pages(
+        ["Um guarda-\nchuva.", "O guarda-chuva e o guardachuva."]
+    )
+
+    assert pages[0] == "Um guarda-chuva."
+
+
+def test_capitalized_fragment_keeps_hyphen():
+    processor = PDFProcessor(remove_headers_footers=False)
+
+    pages = processor._normalize_pages(["Rio-\nGrande", "riogrande"])
+
+    assert pages[0] == "Rio-Grande"
+
+
+# ============================================================================
+# CABEÇALHOS E RODAPÉS
+# ============================================================================
+
+
+PAGE_NAMES = ["um", "dois", "três", "quatro", "cinco"]
+
+
+def make_pages(count):
+    """
+    Páginas com cabeçalho fixo, rodapé numerado e corpo distinto por página
+
+    O corpo não varia só nos números, pois dígitos são ignorados na comparação.
+    """
+    return [
+        "\n".join(
+            ["Relatório Anual FIAP"]
+            + [f"Parágrafo {letter} da página {name}" for letter in "abc"]
+            + [f"Página {page} de {count}"]
+        )
+        for page, name in enumerate(PAGE_NAMES[:count], 1)
+    ]
+
+
+def test_repeated_headers_and_footers_are_removed():
+    processor = PDFProcessor()
+
+    pages = processor._normalize_pages(make_pages(4))
+
+    assert pages[1] == (
+        "Parágrafo a da página dois\n"
+        "Parágrafo b da página dois\n"
+        "Parágrafo c da página dois"
+    )
+
+
+def test_documents_with_less_than_three_pages_are_untouched():
+    processor = PDFProcessor()
+
+    pages = processor._normalize_pages(make_pages(2))
+
+    assert pages[0].startswith("Relatório Anual FIAP")
+    assert pages[0].endswith("Página 1 de 2")
+
+
+def test_edge_lines_repeated_in_few_pages_are_kept():
+    processor = PDFProcessor()
+    pages = make_pages(5)
+    pages[0] = pages[0].replace("Parágrafo c da página um", "Nota de rodapé")
+    pages[1] = pages[1].replace("Parágrafo c da página dois", "Nota de rodapé")
+
+    result = processor._normalize_pages(pages)
+
+    # Aparece na borda de 2 de 5 páginas, abaixo de header_footer_min_ratio
+    assert all("Relatório Anual FIAP" not in page for page in result)
+    assert result[0].endswith("Nota de rodapé")
+
+
+def test_header_footer_lines_limits_the_inspected_edge():
+    processor = PDFProcessor(header_footer_lines=1)
+    pages = [
+        "\n".join(["Título", "Seção repetida", f"Texto {page}", "Rodapé"])
+        for page in range(4)
+    ]
+
+    result = processor._normalize_pages(pages)
+
+    # Só a primeira e a última linha são analisadas
+    assert result[0] == "Seção repetida\nTexto 0"
+
+
+def test_short_pages_are_not_duplicated_by_edge_windows():
+    processor = PDFProcessor(header_footer_lines=2)
+    pages = make_pages(3) + ["Relatório Anual FIAP\nConclusão"]
+
+    result = processor._normalize_pages(pages)
+
+    assert result[3] == "Conclusão"
+
+
+def test_header_footer_lines_must_be_positive():
+    with pytest.raises(ValueError):
+        PDFProcessor(header_footer_lines=0)
+
+
+# ============================================================================
+# CHUNKS E MARCADORES DE PÁGINA
+# ============================================================================
+
+
+def test_mid_page_chunks_carry_their_page_marker():
+    processor = PDFProcessor(chunk_size=120, chunk_overlap=20)
+    pages = [" ".join(f"p{page}w{i}" for i in range(60)) for page in (1, 2)]
+    full_text = "".join(
+        f"\n\n[Página {page}]\n{text}" for page, text in enumerate(pages, 1)
+    )
+
+    chunks = processor._split_into_chunks(full_text)
+
+    assert len(chunks) > 4
+    for chunk in chunks:
+        match = PAGE_MARKER_PATTERN.match(chunk)
+        assert match, chunk
+        first_word = chunk[match.end() :].split()[0]
+        if first_word.startswith("p"):
+            assert first_word.startswith(f"p{match.group(1)}w")